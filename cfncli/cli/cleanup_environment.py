@@ -1,13 +1,113 @@
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from functools import partial, wraps
+from itertools import repeat
+from operator import itemgetter
+
 import boto3
 import click
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from cfncli.helpers import raise_for_click
+from cfncli.helpers import raise_for_click, substring_matcher, ttl_cache
 import logging
 
+# boto3 sessions are not thread-safe but the clients they create are. A single
+# session builds each client once, under a lock, and every thread shares it.
+_session = None
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Adaptive retries let the SDK back off on throttling ("Rate exceeded") instead
+# of surfacing the error once the concurrent steps start hitting API limits.
+# The connection pool is sized above the default of 10 so that the threads of
+# both worker pools sharing a client do not queue for connections, and
+# keepalive keeps reused connections from being dropped between steps.
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": 10},
+    max_pool_connections=64,
+    tcp_keepalive=True,
+)
+
+# Upper bound on concurrent AWS calls made by the shared worker pool.
+MAX_WORKERS = 32
+
+_executor = None
+_batch_delete_executor = None
+_executor_lock = threading.Lock()
+
+# Resource types looked up through the Resource Groups Tagging API, mapped to
+# the key they are gathered under.
+TAGGED_RESOURCE_TYPES = {
+    "s3": "s3_buckets",
+    "ecr:repository": "ecr_repositories",
+    "dynamodb:table": "ddb_tables",
+    "logs:log-group": "log_groups",
+    "lambda:function": "vpc_lambdas",
+}
+
+# Every stack status except DELETE_COMPLETE, so ListStacks skips deleted stacks
+# on the server side.
+LIVE_STACK_STATUSES = [
+    "CREATE_IN_PROGRESS",
+    "CREATE_FAILED",
+    "CREATE_COMPLETE",
+    "ROLLBACK_IN_PROGRESS",
+    "ROLLBACK_FAILED",
+    "ROLLBACK_COMPLETE",
+    "DELETE_IN_PROGRESS",
+    "DELETE_FAILED",
+    "UPDATE_IN_PROGRESS",
+    "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_COMPLETE",
+    "UPDATE_FAILED",
+    "UPDATE_ROLLBACK_IN_PROGRESS",
+    "UPDATE_ROLLBACK_FAILED",
+    "UPDATE_ROLLBACK_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_ROLLBACK_COMPLETE",
+    "REVIEW_IN_PROGRESS",
+    "IMPORT_IN_PROGRESS",
+    "IMPORT_COMPLETE",
+    "IMPORT_ROLLBACK_IN_PROGRESS",
+    "IMPORT_ROLLBACK_FAILED",
+    "IMPORT_ROLLBACK_COMPLETE",
+]
+
+# Batch delete APIs cap the number of items per call: DeleteObjects at 1000
+# keys, BatchDeleteImage at 100 image IDs. Batches are sent by one pool of
+# MAX_BATCH_DELETE_WORKERS threads, shared by every bucket and repository being
+# emptied at the same time.
+S3_DELETE_BATCH_SIZE = 1000
+ECR_DELETE_BATCH_SIZE = 100
+MAX_BATCH_DELETE_WORKERS = 16
+# Batches of one bucket queued or running at a time. Listing waits for deletes
+# to catch up, so the keys of a large bucket are never all held in memory.
+MAX_PENDING_DELETE_BATCHES = MAX_BATCH_DELETE_WORKERS * 2
+
+# Polling cadence used while waiting for CloudFormation stacks to be deleted.
+STACK_POLL_MIN_DELAY = 2
+STACK_POLL_MAX_DELAY = 60
+STACK_POLL_MAX_ATTEMPTS = 120
+
+
 def log_inputs(func):
+    """
+    Logs the arguments and return value of the decorated function at INFO level.
+    Keep it off hot paths such as the gather_* and delete_* functions: the
+    arguments can hold full boto3 responses.
+    """
+    logger = logging.getLogger(__name__)
+
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        logger = logging.getLogger(__name__)
+        if not logger.isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
         logger.info("Function: %s", func.__name__)
         if args:
             logger.info("Positional arguments: %s", args)
@@ -19,129 +119,337 @@ def log_inputs(func):
 
     return wrapper
 
-def gather_resources(substrings, region):
+def _client(service, region):
+    """
+    Returns the boto3 client for a service and region, created on first use
+    and shared by every thread afterwards.
+    """
+    global _session
+    client = _clients.get((service, region))
+    if client is None:
+        with _clients_lock:
+            client = _clients.get((service, region))
+            if client is None:
+                if _session is None:
+                    _session = boto3.session.Session()
+                client = _clients[(service, region)] = _session.client(
+                    service, region_name=region, config=CLIENT_CONFIG
+                )
+    return client
+
+
+def _clear_gather_caches():
+    """
+    Drops cached listings once resources are about to change. Listings are
+    cached in memory only, and a run starts by clearing them, so a cleanup never
+    acts on resources listed before it started.
+    """
+    for gatherer in (
+        gather_tagged,
+        gather_cloudformation_stacks,
+        gather_s3_buckets,
+        gather_ddb_tables,
+        gather_ecr_repositories,
+        gather_log_groups,
+        gather_ssm_params,
+        gather_vpc_lambdas,
+    ):
+        gatherer.cache_clear()
+
+
+def _get_executor():
+    """
+    Returns the worker pool shared by every concurrent step of a cleanup run.
+    Keeping the threads alive saves starting new ones for every step.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="cfncli"
+            )
+    return _executor
+
+
+def _get_batch_delete_executor():
+    """
+    Returns the worker pool sending batch deletes. Buckets and repositories are
+    deleted concurrently by the shared pool, funnelling all of their batches
+    through this one caps the concurrent delete calls of the whole run at
+    MAX_BATCH_DELETE_WORKERS.
+    """
+    global _batch_delete_executor
+    with _executor_lock:
+        if _batch_delete_executor is None:
+            _batch_delete_executor = ThreadPoolExecutor(
+                max_workers=MAX_BATCH_DELETE_WORKERS, thread_name_prefix="cfncli-batch"
+            )
+    return _batch_delete_executor
+
+
+def _gather_concurrently(gatherers, substrings, region, tag_key=None, ignore_list=()):
+    """
+    Runs the given gather functions concurrently and returns their results
+    keyed the same way as the gatherers mapping. When a tag key is given,
+    resource types found through the tagging API skip their gather function,
+    even if none of the tagged resources qualify.
+    """
+    tagged = (
+        gather_tagged(substrings, region, tag_key, ignore_list, keys=tuple(gatherers))
+        if tag_key
+        else {}
+    )
+    executor = _get_executor()
+    futures = {
+        key: executor.submit(gatherer, substrings, region)
+        for key, gatherer in gatherers.items()
+        if tagged.get(key) is None
+    }
+    return {
+        key: tagged[key] if key not in futures else futures[key].result()
+        for key in gatherers
+    }
+
+
+def gather_resources(substrings, region, tag_key=None, ignore_list=()):
     """
     Gathers AWS resources including CloudFormation stacks, S3 buckets, and ECR repositories
     based on specified substrings and region.
     """
-    resources = {
-        "cloudformation_stacks": gather_cloudformation_stacks(substrings, region),
-        "s3_buckets": gather_s3_buckets(substrings, region),
-        "ecr_repositories": gather_ecr_repositories(substrings, region),
-        "vpc_lambdas": gather_vpc_lambdas(substrings, region),
-        "ddb_tables": gather_ddb_tables(substrings, region),
+    gatherers = {
+        "cloudformation_stacks": gather_cloudformation_stacks,
+        "s3_buckets": partial(gather_s3_buckets, ignore_list=ignore_list),
+        "ecr_repositories": gather_ecr_repositories,
+        "vpc_lambdas": gather_vpc_lambdas,
+        "ddb_tables": gather_ddb_tables,
     }
-    return resources
+    return _gather_concurrently(gatherers, substrings, region, tag_key, ignore_list)
 
 
-def gather_unmanaged_resources(substrings, region):
+def gather_unmanaged_resources(
+    substrings, region, tag_key=None, ignore_list=(), s3_buckets=None
+):
     """
     Gathers unmanaged AWS resources including S3 buckets, SSM parameters, and CloudWatch Log Groups
-    based on specified substrings and region.
+    based on specified substrings and region. S3 buckets already gathered by
+    gather_resources can be passed in to skip listing them again.
+    """
+    gatherers = {
+        "ssm_params": gather_ssm_params,
+        "log_groups": gather_log_groups,
+    }
+    if s3_buckets is None:
+        gatherers["s3_buckets"] = partial(gather_s3_buckets, ignore_list=ignore_list)
+    resources = _gather_concurrently(
+        gatherers, substrings, region, tag_key, ignore_list
+    )
+    if s3_buckets is not None:
+        resources["s3_buckets"] = s3_buckets
+    return resources
+
+
+def _resource_name_from_arn(arn):
+    """Extracts the resource name from an S3, ECR, DynamoDB, Log Group or Lambda ARN."""
+    resource = arn.split(":", 5)[5]
+    if resource.startswith("log-group:"):
+        return resource[len("log-group:"):].removesuffix(":*")
+    if resource.startswith("function:"):
+        return resource[len("function:"):]
+    return resource.split("/", 1)[-1]
+
+
+def _is_vpc_lambda(function_name, region):
+    """
+    Tells whether a Lambda function is attached to a VPC. The tagging API keeps
+    listing deleted functions for a while, those count as not attached.
+    """
+    try:
+        configuration = _client("lambda", region).get_function_configuration(
+            FunctionName=function_name
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ResourceNotFoundException":
+            return False
+        raise
+    return bool(configuration.get("VpcConfig", {}).get("VpcId"))
+
+
+@ttl_cache(path=None)
+def gather_tagged(substrings, region, tag_key, ignore_list=(), keys=None):
+    """
+    Gathers S3 buckets, ECR repositories, DynamoDB tables, CloudWatch Log Groups
+    and VPC attached Lambda functions whose `tag_key` tag is set to one of the
+    specified substrings, using a single server-side filtered Resource Groups
+    Tagging API lookup. S3 buckets starting with any prefix of the ignore list
+    are left out, and only the tagged Lambda functions get their configuration
+    fetched to check for a VPC. When `keys` is given, only the resource types
+    gathered under those keys are looked up.
+
+    Types without any tagged resource are returned as None, types whose tagged
+    resources are all left out (ignored buckets, Lambdas outside a VPC) as an
+    empty list.
     """
+    resource_types = [
+        resource_type
+        for resource_type, key in TAGGED_RESOURCE_TYPES.items()
+        if keys is None or key in keys
+    ]
     resources = {
-        "s3_buckets": gather_s3_buckets(substrings, region),
-        "ssm_params": gather_ssm_params(substrings, region),
-        "log_groups": gather_log_groups(substrings, region),
+        TAGGED_RESOURCE_TYPES[resource_type]: None for resource_type in resource_types
     }
+    if not resource_types:
+        # An empty type filter would match every tagged resource.
+        return resources
+
+    ignored = tuple(ignore_list)
+    client = _client("resourcegroupstaggingapi", region)
+    services = {
+        resource_type.split(":")[0]: TAGGED_RESOURCE_TYPES[resource_type]
+        for resource_type in resource_types
+    }
+    paginator = client.get_paginator("get_resources")
+
+    for page in paginator.paginate(
+        TagFilters=[{"Key": tag_key, "Values": list(substrings)}],
+        ResourceTypeFilters=resource_types,
+        PaginationConfig={"PageSize": 100},
+    ):
+        for mapping in page["ResourceTagMappingList"]:
+            arn = mapping["ResourceARN"]
+            key = services.get(arn.split(":")[2])
+            if key:
+                if resources[key] is None:
+                    resources[key] = []
+                name = _resource_name_from_arn(arn)
+                if key == "s3_buckets" and name.startswith(ignored):
+                    continue
+                resources[key].append(name)
+
+    if resources.get("vpc_lambdas") is None:
+        return resources
+    function_names = resources["vpc_lambdas"]
+    in_vpc = _get_executor().map(_is_vpc_lambda, function_names, repeat(region))
+    resources["vpc_lambdas"] = [
+        name for name, attached in zip(function_names, in_vpc) if attached
+    ]
     return resources
 
 
+@ttl_cache(path=None)
 def gather_cloudformation_stacks(substrings, region):
     """
     Gathers CloudFormation parent stacks that include the specified substrings,
     excluding those in DELETE_COMPLETE status, and sorts them by creation time
     so that the oldest stack will get deleted last.
     """
-    client = boto3.client("cloudformation", region_name=region)
+    matches = substring_matcher(tuple(substrings))
+    client = _client("cloudformation", region)
     stack_infos = []  # Store tuples of (stack name, creation time)
-    paginator = client.get_paginator("list_stacks")
+    request = {"StackStatusFilter": LIVE_STACK_STATUSES}
 
-    for page in paginator.paginate():
-        for stack in page["StackSummaries"]:
-            if (
-                "DELETE_COMPLETE" not in stack["StackStatus"]
-                and "ParentId" not in stack
-            ):
-                if any(sub in stack["StackName"] for sub in substrings):
+    while True:
+        response = client.list_stacks(**request)
+        for stack in response["StackSummaries"]:
+            if "ParentId" not in stack:
+                if matches(stack["StackName"]):
                     stack_infos.append((stack["StackName"], stack["CreationTime"]))
+        if not response.get("NextToken"):
+            break
+        request["NextToken"] = response["NextToken"]
 
-    # Sort stacks by creation time in descending order so newer stacks are deleted last
-    sorted_stack_infos = sorted(stack_infos, key=lambda x: x[1], reverse=True)
+    # Sort stacks by creation time in descending order so older stacks are deleted last,
+    # and return only the stack names
+    return [name for name, _ in sorted(stack_infos, key=itemgetter(1), reverse=True)]
 
-    # Extract and return only the stack names from the sorted list
-    sorted_stacks = [info[0] for info in sorted_stack_infos]
-    return sorted_stacks
-
-def gather_s3_buckets(substrings, region):
-    """Gathers S3 buckets that include the specified substrings."""
-    s3 = boto3.resource("s3", region_name=region)
-    buckets = []
-    for bucket in s3.buckets.all():
-        if any(sub in bucket.name for sub in substrings):
-            buckets.append(bucket.name)
-    return buckets
+@ttl_cache(path=None)
+def gather_s3_buckets(substrings, region, ignore_list=()):
+    """
+    Gathers S3 buckets that include the specified substrings, skipping those
+    starting with any prefix of the ignore list.
+    """
+    matches = substring_matcher(tuple(substrings))
+    ignored = tuple(ignore_list)
+    response = _client("s3", region).list_buckets()
+    return [
+        bucket["Name"]
+        for bucket in response["Buckets"]
+        if matches(bucket["Name"]) and not bucket["Name"].startswith(ignored)
+    ]
 
 
+@ttl_cache(path=None)
 def gather_ddb_tables(substrings, region):
     """Gathers DynamoDB tables that include the specified substrings."""
+    matches = substring_matcher(tuple(substrings))
     tables = []
-    ddb_client = boto3.client("dynamodb", region_name=region)
+    ddb_client = _client("dynamodb", region)
     paginator = ddb_client.get_paginator("list_tables")
 
-    for page in paginator.paginate():
+    for page in paginator.paginate(PaginationConfig={"PageSize": 100}):
         for table_name in page["TableNames"]:
-            if any(sub in table_name for sub in substrings):
+            if matches(table_name):
                 tables.append(table_name)
 
     return tables
 
 
+@ttl_cache(path=None)
 def gather_ecr_repositories(substrings, region):
     """Gathers ECR repositories that include the specified substrings."""
-    client = boto3.client("ecr", region_name=region)
+    matches = substring_matcher(tuple(substrings))
+    client = _client("ecr", region)
     repositories = []
     paginator = client.get_paginator("describe_repositories")
-    for page in paginator.paginate():
+    for page in paginator.paginate(PaginationConfig={"PageSize": 1000}):
         for repo in page["repositories"]:
-            if any(sub in repo["repositoryName"] for sub in substrings):
+            if matches(repo["repositoryName"]):
                 repositories.append(repo["repositoryName"])
     return repositories
 
+@ttl_cache(path=None)
 def gather_log_groups(substrings, region):
     """
     Gathers CloudWatch Log Groups that include the specified substrings.
     """
-    client = boto3.client("logs", region_name=region)
+    matches = substring_matcher(tuple(substrings))
+    client = _client("logs", region)
     log_groups = []
-    paginator = client.get_paginator("describe_log_groups")
+    request = {"limit": 50}
 
-    for page in paginator.paginate():
-        for log_group in page["logGroups"]:
-            if any(sub in log_group["logGroupName"] for sub in substrings):
+    while True:
+        response = client.describe_log_groups(**request)
+        for log_group in response["logGroups"]:
+            if matches(log_group["logGroupName"]):
                 log_groups.append(log_group["logGroupName"])
+        if not response.get("nextToken"):
+            break
+        request["nextToken"] = response["nextToken"]
     return log_groups
 
+@ttl_cache(path=None)
 def gather_ssm_params(substrings, region):
     """
     Gathers SSM Parameters that follow the naming convention and include
     the specified substrings.
     """
-    client = boto3.client("ssm", region_name=region)
+    client = _client("ssm", region)
     ssm_params = []
-    paginator = client.get_paginator("describe_parameters")
-
-    for page in paginator.paginate():
-        for param in page["Parameters"]:
-            for sub in substrings:
-                # env, prefix = sub.split("-")
-                if param["Name"].startswith(f"/{sub}/"):
-                    ssm_params.append(param["Name"])
-                    break
+    prefixes = tuple(f"/{sub}/" for sub in substrings)
+    request = {"MaxResults": 50}
+
+    while True:
+        response = client.describe_parameters(**request)
+        for param in response["Parameters"]:
+            if param["Name"].startswith(prefixes):
+                ssm_params.append(param["Name"])
+        if not response.get("NextToken"):
+            break
+        request["NextToken"] = response["NextToken"]
 
     return ssm_params
 
 
+@ttl_cache(path=None)
 def gather_vpc_lambdas(substrings, region):
     """
     Gathers Lambda functions by substrings, filters those in a VPC.
@@ -150,14 +458,15 @@ def gather_vpc_lambdas(substrings, region):
     :param region: AWS region where the Lambda functions are deployed.
     :return: List of Lambda function names to be updated.
     """
-    client = boto3.client("lambda", region_name=region)
+    matches = substring_matcher(tuple(substrings))
+    client = _client("lambda", region)
     lambda_functions = []
     paginator = client.get_paginator("list_functions")
 
-    for page in paginator.paginate():
+    for page in paginator.paginate(PaginationConfig={"PageSize": 50}):
         for function in page["Functions"]:
             if (
-                any(sub in function["FunctionName"] for sub in substrings)
+                matches(function["FunctionName"])
                 and "VpcConfig" in function
                 and function["VpcConfig"].get("VpcId")
             ):
@@ -166,79 +475,279 @@ def gather_vpc_lambdas(substrings, region):
     return lambda_functions
 
 
-def empty_s3_buckets(bucket_names, region):
+def _s3_delete_batches(client, bucket_name):
+    """
+    Yields lists of at most S3_DELETE_BATCH_SIZE objects to delete from a bucket.
+    Versioned (or once versioned) buckets yield every object version and delete
+    marker, unversioned buckets only need a plain object listing.
+    """
+    versioning = client.get_bucket_versioning(Bucket=bucket_name).get("Status")
+    pagination_config = {"PageSize": S3_DELETE_BATCH_SIZE}
+    if versioning:
+        paginator = client.get_paginator("list_object_versions")
+        for page in paginator.paginate(
+            Bucket=bucket_name, PaginationConfig=pagination_config
+        ):
+            objects = [
+                {"Key": version["Key"], "VersionId": version["VersionId"]}
+                for version in page.get("Versions", []) + page.get("DeleteMarkers", [])
+            ]
+            for i in range(0, len(objects), S3_DELETE_BATCH_SIZE):
+                yield objects[i : i + S3_DELETE_BATCH_SIZE]
+    else:
+        paginator = client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=bucket_name, PaginationConfig=pagination_config
+        ):
+            objects = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if objects:
+                yield objects
+
+
+def _delete_s3_objects(client, bucket_name, objects):
+    """Deletes one batch of objects, failing if S3 reports any per-key error."""
+    response = client.delete_objects(
+        Bucket=bucket_name, Delete={"Objects": objects, "Quiet": True}
+    )
+    errors = response.get("Errors")
+    if errors:
+        raise RuntimeError(
+            f"Failed to delete {len(errors)} objects from {bucket_name}: {errors[0]['Message']}"
+        )
+
+
+def _empty_s3_bucket(client, bucket_name):
+    """Empties a single S3 bucket, deleting its object batches concurrently."""
+    executor = _get_batch_delete_executor()
+    pending = set()
+    try:
+        for objects in _s3_delete_batches(client, bucket_name):
+            if len(pending) >= MAX_PENDING_DELETE_BATCHES:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(
+                executor.submit(_delete_s3_objects, client, bucket_name, objects)
+            )
+    finally:
+        # Never leave batches running behind a failure.
+        wait(pending)
+    for future in pending:
+        future.result()
+
+
+def _check_not_ignored(bucket_name, ignore_list):
+    """Refuses to touch a bucket on the ignore list, should one slip through gathering."""
+    if bucket_name.startswith(tuple(ignore_list)):
+        raise_for_click(f"Refusing to modify ignored S3 bucket {bucket_name}")
+
+
+def empty_s3_buckets(bucket_names, region, ignore_list=()):
     """Empties specified S3 buckets."""
-    s3 = boto3.resource("s3", region_name=region)
+    client = _client("s3", region)
     for bucket_name in bucket_names:
-        bucket = s3.Bucket(bucket_name)
-        bucket.object_versions.delete()
+        _check_not_ignored(bucket_name, ignore_list)
+        _empty_s3_bucket(client, bucket_name)
         click.secho(f"Emptied S3 bucket: {bucket_name}", fg="red")
 
 
+def _delete_ecr_images(client, repo_name, image_ids):
+    """Deletes one batch of images, failing if ECR reports any per-image failure."""
+    response = client.batch_delete_image(repositoryName=repo_name, imageIds=image_ids)
+    failures = response.get("failures")
+    if failures:
+        raise RuntimeError(
+            f"Failed to delete {len(failures)} images from {repo_name}: {failures[0]['failureReason']}"
+        )
+
+
 def empty_ecr_repositories(repository_names, region):
     """Empties specified ECR repositories."""
-    client = boto3.client("ecr", region_name=region)
+    client = _client("ecr", region)
+    paginator = client.get_paginator("list_images")
     for repo_name in repository_names:
-        images = client.list_images(repositoryName=repo_name)
-        image_ids = [
-            {"imageDigest": image["imageDigest"]}
-            for image in images.get("imageIds", [])
-        ]
+        # An image listed under several tags shows up once per tag.
+        image_digests = set()
+        for page in paginator.paginate(
+            repositoryName=repo_name, PaginationConfig={"PageSize": 1000}
+        ):
+            image_digests.update(image["imageDigest"] for image in page["imageIds"])
+        image_ids = [{"imageDigest": digest} for digest in image_digests]
         if image_ids:
-            client.batch_delete_image(repositoryName=repo_name, imageIds=image_ids)
+            executor = _get_batch_delete_executor()
+            futures = [
+                executor.submit(
+                    _delete_ecr_images,
+                    client,
+                    repo_name,
+                    image_ids[i : i + ECR_DELETE_BATCH_SIZE],
+                )
+                for i in range(0, len(image_ids), ECR_DELETE_BATCH_SIZE)
+            ]
+            wait(futures)
+            for future in futures:
+                future.result()
             click.secho(f"Emptied ECR repository: {repo_name}", fg="red")
 
 
 def delete_cloudformation_stack(stack_name, region):
-    """Deletes a single CloudFormation stack and waits for the deletion to complete using a waiter."""
-    client = boto3.client("cloudformation", region_name=region)
-    try:
-        # Initiate stack deletion
-        client.delete_stack(StackName=stack_name)
+    """Deletes a single CloudFormation stack and waits for the deletion to complete."""
+    delete_cloudformation_stacks_bulk([stack_name], region)
+
+
+def delete_cloudformation_stacks_bulk(stack_names, region):
+    """
+    Initiates the deletion of all given CloudFormation stacks, then waits for
+    them in a single polling loop with exponential backoff instead of running
+    one waiter per stack.
+    """
+    client = _client("cloudformation", region)
+    pending = set()
+    for stack_name in stack_names:
+        try:
+            client.delete_stack(StackName=stack_name)
+            click.secho(
+                f"Initiated deletion of CloudFormation stack: {stack_name}", fg="yellow"
+            )
+            pending.add(stack_name)
+        except ClientError as e:
+            # Specific error handling for stack does not exist scenario
+            if (
+                e.response["Error"]["Code"] == "ValidationError"
+                and "does not exist" in e.response["Error"]["Message"]
+            ):
+                click.secho(
+                    f"CloudFormation stack {stack_name} does not exist or is already deleted.",
+                    fg="yellow",
+                )
+            else:
+                # For other ClientErrors, propagate the error message
+                raise_for_click(f"Failed to delete CloudFormation stack {stack_name}: {e}")
+
+    delay = STACK_POLL_MIN_DELAY
+    for _ in range(STACK_POLL_MAX_ATTEMPTS):
+        if not pending:
+            return
         click.secho(
-            f"Initiated deletion of CloudFormation stack: {stack_name}", fg="yellow"
+            f"Waiting for stacks {', '.join(sorted(pending))} to be deleted...",
+            fg="yellow",
         )
+        time.sleep(delay)
+        delay = min(delay * 2, STACK_POLL_MAX_DELAY)
 
-        # Create a waiter to wait for stack deletion to complete
-        waiter = client.get_waiter("stack_delete_complete")
+        try:
+            statuses = _describe_stack_statuses(client, pending)
+        except ClientError as e:
+            raise_for_click(f"Failed to describe CloudFormation stacks: {e}")
+
+        for stack_name in sorted(pending):
+            # Deleted stacks are no longer returned by DescribeStacks.
+            status, reason = statuses.get(stack_name, ("DELETE_COMPLETE", None))
+            if status == "DELETE_COMPLETE":
+                pending.discard(stack_name)
+                click.secho(
+                    f"CloudFormation stack {stack_name} deleted successfully.", fg="green"
+                )
+            elif status == "DELETE_FAILED":
+                raise_for_click(
+                    f"Failed to delete CloudFormation stack {stack_name}: {reason}"
+                )
 
-        # Wait for the stack to be deleted
-        click.secho(f"Waiting for stack {stack_name} to be deleted...", fg="yellow")
-        waiter.wait(StackName=stack_name)
-        click.secho(
-            f"CloudFormation stack {stack_name} deleted successfully.", fg="green"
+    if pending:
+        raise_for_click(
+            f"Timed out waiting for CloudFormation stacks to be deleted: {', '.join(sorted(pending))}"
         )
 
+
+def _stack_dependents(stack_names, region):
+    """
+    Maps each of the given stacks to the ones among them that import one of
+    its exports, and therefore have to be deleted before it.
+    """
+    client = _client("cloudformation", region)
+    dependents = {stack_name: set() for stack_name in stack_names}
+    imports_paginator = client.get_paginator("list_imports")
+
+    for page in client.get_paginator("list_exports").paginate():
+        for export in page["Exports"]:
+            # arn:aws:cloudformation:<region>:<account>:stack/<name>/<id>
+            exporting_stack = export["ExportingStackId"].split("/")[1]
+            if exporting_stack not in dependents:
+                continue
+            try:
+                for imports_page in imports_paginator.paginate(ExportName=export["Name"]):
+                    dependents[exporting_stack].update(
+                        name for name in imports_page["Imports"] if name in dependents
+                    )
+            except ClientError as e:
+                # ListImports fails for exports that no stack imports
+                if "is not imported by any stack" not in e.response["Error"]["Message"]:
+                    raise
+    return dependents
+
+
+def delete_cloudformation_stacks_in_waves(stack_names, region):
+    """
+    Deletes CloudFormation stacks in dependency order. Each wave deletes, all at
+    once, the stacks whose exports are not imported by any remaining stack, so
+    independent stacks are deleted in parallel and importers go before exporters.
+    """
+    try:
+        dependents = _stack_dependents(stack_names, region)
     except ClientError as e:
-        # Specific error handling for stack does not exist scenario
-        if (
-            e.response["Error"]["Code"] == "ValidationError"
-            and "does not exist" in e.response["Error"]["Message"]
-        ):
-            click.secho(
-                f"CloudFormation stack {stack_name} does not exist or is already deleted.",
-                fg="yellow",
-            )
-        else:
-            # For other ClientErrors, propagate the error message
-            raise_for_click(f"Failed to delete CloudFormation stack {stack_name}: {e}")
+        raise_for_click(f"Failed to list CloudFormation exports and imports: {e}")
+
+    remaining = list(stack_names)
+    while remaining:
+        # CloudFormation rejects circular imports, the fallback only guards
+        # against looping forever should that ever not hold.
+        wave = [
+            stack_name
+            for stack_name in remaining
+            if not dependents[stack_name].intersection(remaining)
+        ] or remaining
+        delete_cloudformation_stacks_bulk(wave, region)
+        remaining = [stack_name for stack_name in remaining if stack_name not in wave]
+
+
+def _describe_stack_statuses(client, stack_names):
+    """Returns {stack name: (status, status reason)} for the given live stacks."""
+    statuses = {}
+    paginator = client.get_paginator("describe_stacks")
+    for page in paginator.paginate():
+        for stack in page["Stacks"]:
+            if stack["StackName"] in stack_names:
+                statuses[stack["StackName"]] = (
+                    stack["StackStatus"],
+                    stack.get("StackStatusReason"),
+                )
+    return statuses
 
 
-def delete_s3_bucket(bucket_name, region):
+def delete_s3_bucket(bucket_name, region, ignore_list=()):
     """Deletes a single S3 bucket after emptying it."""
-    s3 = boto3.resource("s3", region_name=region)
-    bucket = s3.Bucket(bucket_name)
+    _check_not_ignored(bucket_name, ignore_list)
+    client = _client("s3", region)
     try:
-        bucket.object_versions.delete()
-        bucket.delete()
+        _empty_s3_bucket(client, bucket_name)
+        client.delete_bucket(Bucket=bucket_name)
         click.secho(f"Deleted S3 bucket: {bucket_name}", fg="red")
+    except ClientError as e:
+        # Buckets owned by a stack are removed along with it
+        if e.response["Error"]["Code"] == "NoSuchBucket":
+            click.secho(
+                f"S3 bucket {bucket_name} does not exist or is already deleted.",
+                fg="yellow",
+            )
+        else:
+            raise_for_click(f"Failed to delete S3 bucket {bucket_name}: {e}")
     except Exception as e:
         raise_for_click(f"Failed to delete S3 bucket {bucket_name}: {e}")
 
 
 def delete_ecr_repository(repo_name, region):
     """Deletes a single ECR repository."""
-    client = boto3.client("ecr", region_name=region)
+    client = _client("ecr", region)
     try:
         client.delete_repository(repositoryName=repo_name, force=True)
         click.secho(f"Deleted ECR repository: {repo_name}", fg="red")
@@ -248,7 +757,7 @@ def delete_ecr_repository(repo_name, region):
 
 def delete_ssm_param(param_name, region):
     """Deletes a single SSM Parameter."""
-    client = boto3.client("ssm", region_name=region)
+    client = _client("ssm", region)
     try:
         client.delete_parameter(Name=param_name)
         click.secho(f"Deleted SSM Parameter: {param_name}", fg="red")
@@ -258,7 +767,7 @@ def delete_ssm_param(param_name, region):
 
 def delete_log_group(log_group_name, region):
     """Deletes a single CloudWatch Log Group."""
-    client = boto3.client("logs", region_name=region)
+    client = _client("logs", region)
     try:
         client.delete_log_group(logGroupName=log_group_name)
         click.secho(f"Deleted Log Group: {log_group_name}", fg="red")
@@ -273,14 +782,23 @@ def update_lambda_vpc_config(lambda_functions, region):
     :param lambda_functions: List of Lambda function names to update.
     :param region: AWS region where the Lambda functions are deployed.
     """
-    client = boto3.client("lambda", region_name=region)
+    _clear_gather_caches()
+
+    def remove_vpc_config(function_name):
+        _client("lambda", region).update_function_configuration(
+            FunctionName=function_name,
+            VpcConfig={"SubnetIds": [], "SecurityGroupIds": []},
+        )
 
-    for function_name in lambda_functions:
+    executor = _get_executor()
+    futures = {
+        executor.submit(remove_vpc_config, function_name): function_name
+        for function_name in lambda_functions
+    }
+    for future in as_completed(futures):
+        function_name = futures[future]
         try:
-            client.update_function_configuration(
-                FunctionName=function_name,
-                VpcConfig={"SubnetIds": [], "SecurityGroupIds": []},
-            )
+            future.result()
             click.secho(
                 f"Updated Lambda function '{function_name}' to remove VPC configuration.",
                 fg="yellow",
@@ -296,11 +814,21 @@ def remove_ddb_deletion_protection(table_names, region):
     :param table_names: List of DynamoDB table names to remove deletion protection from.
     :param region: AWS region where the DynamoDB tables are deployed.
     """
-    client = boto3.client("dynamodb", region_name=region)
 
-    for table_name in table_names:
+    def disable_deletion_protection(table_name):
+        _client("dynamodb", region).update_table(
+            TableName=table_name, DeletionProtectionEnabled=False
+        )
+
+    executor = _get_executor()
+    futures = {
+        executor.submit(disable_deletion_protection, table_name): table_name
+        for table_name in table_names
+    }
+    for future in as_completed(futures):
+        table_name = futures[future]
         try:
-            client.update_table(TableName=table_name, DeletionProtectionEnabled=False)
+            future.result()
             click.secho(
                 f"Deletion protection disabled for DynamoDB table '{table_name}'.",
                 fg="yellow",
@@ -321,14 +849,33 @@ delete_methods = {
 }
 
 
-def delete_resources(resource_dict, region):
-    """Map of resource types to their deletion methods, now including SSM Parameters and Log Groups."""
+def delete_resources(resource_dict, region, ignore_list=()):
+    """
+    Deletes the given resources concurrently, one resource type at a time.
+    CloudFormation stacks are deleted in dependency waves sharing a single waiter.
+    """
 
+    _clear_gather_caches()
     for resource_type, resources in resource_dict.items():
         delete_method = delete_methods.get(resource_type)
-        if delete_method:
-            for resource_name in resources:
-                delete_method(resource_name, region)
+        if resource_type == "cloudformation_stacks":
+            delete_cloudformation_stacks_in_waves(resources, region)
+        elif delete_method:
+            if resource_type == "s3_buckets":
+                delete_method = partial(delete_method, ignore_list=ignore_list)
+            executor = _get_executor()
+            futures = {
+                executor.submit(delete_method, resource_name, region): resource_name
+                for resource_name in resources
+            }
+            wait(futures)
+            for future, resource_name in futures.items():
+                try:
+                    future.result()
+                except click.ClickException:
+                    raise
+                except Exception as e:
+                    raise_for_click(f"Failed to delete {resource_type} {resource_name}: {e}")
         else:
             click.secho(
                 f"No deletion method found for resource type: {resource_type}",
@@ -341,19 +888,22 @@ def cleanup_env(
     logger,
     no_confirm=False,
     env_list=None,
+    tag_key=None,
 ):
     # env_name = ctx.obj["ENV_NAME"]
     # env_prefix = ctx.obj["ENV_PREFIX"]
     region = ctx.obj["REGION"]
     account_id = ctx.obj["ACCOUNT_ID"]
+    ignore_list = ctx.obj.get("IGNORE_LIST", ())
 
     substrings = env_list
+    _clear_gather_caches()
 
     click.secho(f"Cleaning up: {substrings} in {account_id}:{region}", fg="red")
 
     if click.confirm("Do you want to proceed?", default=True):
         # 1. Gather Resources
-        resources = gather_resources(substrings, region)
+        resources = gather_resources(substrings, region, tag_key, ignore_list)
 
         # Example for S3 buckets
         if resources["s3_buckets"]:
@@ -364,7 +914,7 @@ def cleanup_env(
             if no_confirm or click.confirm(
                 "Do you want to proceed with emptying these S3 buckets?", default=True
             ):
-                empty_s3_buckets(resources["s3_buckets"], region)
+                empty_s3_buckets(resources["s3_buckets"], region, ignore_list)
             # else:
             #     ctx.abort()
         else:
@@ -434,10 +984,14 @@ def cleanup_env(
             click.secho("No CloudFormation stacks", fg="yellow")
 
         # 5. Gather Unmanaged Resources
-        unmanaged_resources = gather_unmanaged_resources(substrings, region)
+        # Buckets are not re-listed: any that were removed along with their
+        # stack are reported as already deleted.
+        unmanaged_resources = gather_unmanaged_resources(
+            substrings, region, tag_key, ignore_list, resources["s3_buckets"]
+        )
 
         # 6. Handle Remaining S3 Buckets
-        for resource_type, delete_function in delete_methods.items():
+        for resource_type in delete_methods:
             resources = unmanaged_resources.get(resource_type, [])
             if resources:
                 resource_names = "\n".join(resources)
@@ -445,13 +999,19 @@ def cleanup_env(
                     f"The following {resource_type} will be deleted:", fg="yellow"
                 )
                 click.secho(resource_names, fg="red")
+                if resource_type == "s3_buckets":
+                    click.secho(
+                        "Some of these buckets may have been removed along with "
+                        "their CloudFormation stack, those are reported as already "
+                        "deleted.",
+                        fg="yellow",
+                    )
 
                 if no_confirm or click.confirm(
                     f"Do you want to proceed with deleting these {resource_type}?",
                     default=True,
                 ):
-                    for resource_name in resources:
-                        delete_function(resource_name, region)
+                    delete_resources({resource_type: resources}, region, ignore_list)
 
         click.secho(f"Cleaned up: {substrings}", fg="green")
 
@@ -72,6 +72,19 @@ def dev(ctx):
     callback=lambda ctx, param, value: value.split(",") if value else None,
     help="Comma-separated list of environment prefixes, USE WITH TRIPLE EXTREME CAUTION",
 )
+@click.option(
+    "--ignore-list",
+    "-il",
+    default=None,
+    callback=lambda ctx, param, value: tuple(value.split(",")) if value else (),
+    help="Comma-separated list of S3 bucket prefixes that are never emptied or deleted",
+)
+@click.option(
+    "--tag-key",
+    "-tk",
+    default=None,
+    help="Tag key (e.g. Environment) whose value matches the prefixes; matching resources are looked up through the Resource Groups Tagging API first",
+)
 @click.option(
     "-noconfirm",
     "--no-confirm",
@@ -80,9 +93,10 @@ def dev(ctx):
 )
 @click.pass_context
 @click_log.simple_verbosity_option(logger.name)
-def cleanup_env_cli(ctx, no_confirm, prefix_list):
+def cleanup_env_cli(ctx, no_confirm, prefix_list, ignore_list, tag_key):
+    ctx.obj["IGNORE_LIST"] = ignore_list
     try:
-        cleanup_env(ctx, logger, no_confirm, prefix_list)
+        cleanup_env(ctx, logger, no_confirm, prefix_list, tag_key)
     except Exception as e:
         raise_for_click(e)
 
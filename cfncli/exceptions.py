@@ -1,6 +1,10 @@
-import json
+import functools
+import logging
 from http import HTTPStatus
 
+import orjson
+
+logger = logging.getLogger(__name__)
 
 
 class ApplicationException(Exception):
@@ -48,3 +52,42 @@ class UnprocessableEntityException(HttpException):
 class TooManyRequestsException(HttpException):
     def __init__(self, message):
         super().__init__(HTTPStatus.TOO_MANY_REQUESTS, message)
+
+
+def handle_exceptions(user_exceptions=None):
+    """
+    Decorator for Lambda handlers that turns exceptions into API Gateway responses.
+
+    Exceptions listed in `user_exceptions` are answered with their own status code
+    and message, any other exception with a generic 500 response.
+    """
+    user_exceptions = tuple(user_exceptions or ())
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            try:
+                return handler(event, context)
+            except user_exceptions as e:
+                return _error_response(
+                    getattr(e, "status_code", 500), getattr(e, "message", str(e))
+                )
+            except Exception:
+                logger.exception("Unhandled error in %s", handler.__name__)
+                return _make_resp(500, _INTERNAL_ERROR_BODY)
+
+        return wrapper
+
+    return decorator
+
+
+# The generic 500 body never changes, so it is serialized once at import.
+_INTERNAL_ERROR_BODY = orjson.dumps({"message": "Internal server error"}).decode()
+
+
+def _make_resp(status_code, body):
+    return {"statusCode": status_code, "body": body}
+
+
+def _error_response(status_code, message):
+    return _make_resp(status_code, orjson.dumps({"message": message}).decode())
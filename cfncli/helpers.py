@@ -1,10 +1,18 @@
+import functools
+import glob
+import hashlib
 import json
+import os
+import re
+import tempfile
+import time
 from datetime import datetime, timezone
 from decimal import Decimal
 
 import boto3
 import click
 import jsonschema
+import orjson
 
 from botocore.exceptions import ClientError
 from click import Option, UsageError
@@ -42,20 +50,58 @@ def validate_request(request: dict, schema: dict, logger=None) -> bool:
         raise validation_error
     return True
 
+# Only JSON objects and arrays are parsed, anything else skips the parser.
+# Leading whitespace is allowed, as it is by the parser.
+_JSON_HEADS = frozenset("{[")
+
+
 def str_to_json(str_input):
-    if isinstance(str_input, str):
-        try:
-            return json.loads(str_input)
-        except json.JSONDecodeError:
-            pass
-    return str_input
+    if not isinstance(str_input, str) or str_input.lstrip()[:1] not in _JSON_HEADS:
+        return str_input
+    try:
+        return orjson.loads(str_input)
+    except orjson.JSONDecodeError:
+        return str_input
 
 
 def convert_json_fields(item, fields):
-    for field in fields:
-        if field in item:
-            item[field] = str_to_json(item[field])
-    return item
+    """
+    Returns a copy of `item` with the JSON object or array strings held by any
+    of the given fields parsed. Other values are left untouched without
+    reaching the parser.
+    """
+    return _convert_json_fields(item, frozenset(fields))
+
+
+def convert_json_fields_many(items, fields):
+    """
+    Converts the JSON fields of every item, e.g. the pages of a DynamoDB Scan,
+    building the field set once for the whole batch.
+    """
+    fields = frozenset(fields)
+    return [_convert_json_fields(item, fields) for item in items]
+
+
+def _convert_json_fields(item, fields: frozenset):
+    return {
+        key: str_to_json(value) if key in fields else value
+        for key, value in item.items()
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def substring_matcher(substrings: tuple):
+    """
+    Returns a predicate telling whether a name contains any of the substrings.
+
+    All substrings are folded into one compiled pattern, so each name is
+    scanned once by the regex engine instead of once per substring. Matchers
+    are cached per substring tuple and built only once per run.
+    """
+    if not substrings:
+        return lambda name: False
+    pattern = re.compile("|".join(map(re.escape, substrings)))
+    return lambda name: pattern.search(name) is not None
 
 
 def decimal_serializer(obj):
@@ -64,26 +110,61 @@ def decimal_serializer(obj):
     raise TypeError("Type not serializable")
 
 
-def generate_response(data, status_code=200):
+# Naive datetimes are treated as UTC and numpy arrays are serialized natively.
+# Non-str dict keys are turned into strings, as json.dumps does. Dataclasses
+# need no flag, orjson serializes them by default.
+_DUMP_OPTS = (
+    orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+)
+
+
+def generate_response(data, status_code=200, as_bytes=False):
+    """
+    Builds an API Gateway style response. With `as_bytes` the body is left as
+    the bytes orjson produces, for runtimes that accept them, saving the
+    decode to str.
+    """
+    body = orjson.dumps(data, default=decimal_serializer, option=_DUMP_OPTS)
     return {
         "statusCode": status_code,
-        "body": json.dumps(data, default=decimal_serializer),
+        "body": body if as_bytes else body.decode(),
     }
 
 
+_SSM = None
+
+# Parameter values cached per name as (time fetched, value) for SSM_CACHE_TTL seconds.
+SSM_CACHE_TTL = float(os.environ.get("SSM_CACHE_TTL", 300))
+_SSM_CACHE: dict[str, tuple[float, str]] = {}
+
+
+def _ssm():
+    """Returns the SSM client, created on first use and reused by later calls."""
+    global _SSM
+    if _SSM is None:
+        _SSM = boto3.client("ssm")
+    return _SSM
+
+
 def get_ssm_parameter(parameter_name: str) -> str:
     """
-    Retrieve the value of an SSM parameter.
+    Retrieve the value of an SSM parameter. Values are cached in memory for
+    SSM_CACHE_TTL seconds, use `get_ssm_parameter.cache_clear()` to reset.
 
     :param parameter_name: Name of the SSM parameter.
     :return: Value of the SSM parameter.
     :raises ApplicationException: If the parameter is not found or any other AWS-related error occurs.
     """
-    ssm_client = boto3.client("ssm")
+    cached = _SSM_CACHE.get(parameter_name)
+    if cached and time.monotonic() - cached[0] < SSM_CACHE_TTL:
+        return cached[1]
     try:
-        response = ssm_client.get_parameter(Name=parameter_name, WithDecryption=True)
-        return response["Parameter"]["Value"]
+        response = _ssm().get_parameter(Name=parameter_name, WithDecryption=True)
+        value = response["Parameter"]["Value"]
+        _SSM_CACHE[parameter_name] = (time.monotonic(), value)
+        return value
     except ClientError as e:
+        _SSM_CACHE.pop(parameter_name, None)
         # You can further distinguish different types of ClientErrors by checking e.response['Error']['Code']
         if e.response["Error"]["Code"] == "ParameterNotFound":
             raise ApplicationException(f"Parameter {parameter_name} not found.")
@@ -92,6 +173,9 @@ def get_ssm_parameter(parameter_name: str) -> str:
         )
 
 
+get_ssm_parameter.cache_clear = _SSM_CACHE.clear
+
+
 def get_region():
     session = boto3.session.Session()
     return session.region_name
@@ -121,17 +205,17 @@ def sanitize_json(value):
         # Attempt to parse the string only if it contains '{' or '['
         if "{" in value or "[" in value:
             try:
-                parsed_json = json.loads(value)
+                parsed_json = orjson.loads(value)
                 return sanitize_json(parsed_json)
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
         return value  # Return the original string if not a JSON object/array or if parsing fails
     elif isinstance(value, Decimal):
         # Convert Decimal to string and attempt to parse as JSON
         try:
-            parsed_json = json.loads(str(value))
+            parsed_json = orjson.loads(str(value))
             return sanitize_json(parsed_json)
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return value
     else:
         return value
@@ -155,6 +239,91 @@ def generate_utc_timestamp() -> str:
     return datetime.now(timezone.utc).isoformat() + "Z"
 
 
+def ttl_cache(path: str | None = "~/.cache/cfncli", ttl: int = 300, scope=None):
+    """
+    Caches the JSON-serializable result of a function for `ttl` seconds, on
+    disk or, when `path` is None, in memory for the life of the process.
+
+    Entries are keyed by the function name, its arguments and, if given, the
+    value returned by the `scope` callable (e.g. the caller's AWS identity).
+    The decorated function gains a `cache_clear()` method that removes all of
+    its entries.
+
+    Args:
+        path (str): Directory holding the cache files, None to cache in memory.
+        ttl (int): Number of seconds an entry stays valid.
+        scope (callable): Optional callable returning an extra cache key part.
+    """
+    cache_dir = os.path.expanduser(path) if path is not None else None
+
+    def decorator(func):
+        # In-memory entries as {key: (time stored, JSON text)}. They are stored
+        # as JSON like the files, so every call gets its own copy of the result.
+        entries = {}
+
+        def cache_key(args, kwargs):
+            key = [func.__name__, scope() if scope else None, args, kwargs]
+            digest = hashlib.sha256(
+                json.dumps(key, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            if cache_dir is None:
+                return digest
+            return os.path.join(cache_dir, f"{func.__name__}-{digest}.json")
+
+        def load(key):
+            if cache_dir is None:
+                stored, text = entries.get(key, (None, None))
+                if stored is not None and time.monotonic() - stored < ttl:
+                    return json.loads(text)
+                raise LookupError(key)
+            if time.time() - os.path.getmtime(key) < ttl:
+                with open(key) as f:
+                    return json.load(f)
+            raise LookupError(key)
+
+        def store(key, result):
+            if cache_dir is None:
+                entries[key] = (time.monotonic(), json.dumps(result))
+                return
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=cache_dir, suffix=".tmp", delete=False
+            ) as f:
+                json.dump(result, f)
+            os.replace(f.name, key)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(args, kwargs)
+            try:
+                return load(key)
+            except (LookupError, OSError, ValueError):
+                pass
+
+            result = func(*args, **kwargs)
+            try:
+                store(key, result)
+            except OSError:
+                # Caching is best effort, a read-only home directory is fine.
+                pass
+            return result
+
+        def cache_clear():
+            entries.clear()
+            if cache_dir is None:
+                return
+            for filename in glob.glob(os.path.join(cache_dir, f"{func.__name__}-*.json")):
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
 def raise_for_click(message: str) -> None:
     """
     Raises an exception in a style consistent with Click's CLI error handling.
@@ -1,8 +1,6 @@
 import os
 
-import boto3
 import pytest
-from moto import mock_dynamodb
 
 TEST = "TEST"
 
@@ -19,6 +17,9 @@ def aws_credentials():
 @pytest.fixture
 def dynamodb_client(aws_credentials):
     """DynamoDB mock client."""
+    import boto3
+    from moto import mock_dynamodb
+
     with mock_dynamodb():
         conn = boto3.client("dynamodb", region_name="us-west-2")
         yield conn
@@ -27,6 +28,9 @@ def dynamodb_client(aws_credentials):
 @pytest.fixture
 def dynamodb_resource(aws_credentials):
     """DynamoDB mock resource."""
+    import boto3
+    from moto import mock_dynamodb
+
     with mock_dynamodb():
         conn = boto3.resource("dynamodb", region_name="us-west-2")
         yield conn
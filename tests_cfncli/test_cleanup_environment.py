@@ -0,0 +1,508 @@
+import threading
+import time
+from collections import defaultdict
+
+import click
+import pytest
+from botocore.exceptions import ClientError
+
+from cfncli.cli import cleanup_environment
+from cfncli.cli.cleanup_environment import (
+    delete_cloudformation_stacks_bulk,
+    delete_cloudformation_stacks_in_waves,
+    delete_s3_bucket,
+    empty_ecr_repositories,
+    empty_s3_buckets,
+    gather_s3_buckets,
+    gather_tagged,
+)
+
+REGION = "us-west-2"
+
+
+class StubClient:
+    """Stands in for a boto3 client, tests set the methods they need."""
+
+
+class StubPaginator:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def paginate(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.pages
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    stubs = defaultdict(StubClient)
+    monkeypatch.setattr(
+        cleanup_environment, "_client", lambda service, region: stubs[service]
+    )
+    return stubs
+
+
+def test_client_shared_across_threads(monkeypatch):
+    sessions = []
+
+    class StubSession:
+        def __init__(self):
+            sessions.append(self)
+
+        def client(self, service, region_name, config):
+            return StubClient()
+
+    monkeypatch.setattr(cleanup_environment.boto3.session, "Session", StubSession)
+    monkeypatch.setattr(cleanup_environment, "_session", None)
+    monkeypatch.setattr(cleanup_environment, "_clients", {})
+
+    executor = cleanup_environment._get_executor()
+    clients = list(
+        executor.map(lambda _: cleanup_environment._client("s3", REGION), range(64))
+    )
+
+    assert len(sessions) == 1
+    assert all(client is clients[0] for client in clients)
+    assert cleanup_environment._client("s3", "us-east-1") is not clients[0]
+
+
+def _client_error(code, operation, message=""):
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation)
+
+
+def _tagged_pages(*arns):
+    return [{"ResourceTagMappingList": [{"ResourceARN": arn} for arn in arns]}]
+
+
+# gather_tagged is cached, the tests call the undecorated function.
+_gather_tagged = gather_tagged.__wrapped__
+
+
+def test_gather_tagged_only_requested_types(clients):
+    paginator = StubPaginator(
+        _tagged_pages(f"arn:aws:logs:{REGION}:123456789012:log-group:/dev/app:*")
+    )
+    clients["resourcegroupstaggingapi"].get_paginator = lambda name: paginator
+
+    def get_function_configuration(**kwargs):
+        raise AssertionError("Lambda functions were not requested")
+
+    clients["lambda"].get_function_configuration = get_function_configuration
+
+    resources = _gather_tagged(
+        ("dev",), REGION, "env", keys=("ssm_params", "log_groups")
+    )
+
+    assert resources == {"log_groups": ["/dev/app"]}
+    assert paginator.calls[0]["ResourceTypeFilters"] == ["logs:log-group"]
+
+
+def test_gather_tagged_no_requested_types(clients):
+    resources = _gather_tagged(("dev",), REGION, "env", keys=("ssm_params",))
+    assert resources == {}
+
+
+def test_gather_tagged_skips_deleted_lambdas(clients):
+    arn = f"arn:aws:lambda:{REGION}:123456789012:function:"
+    paginator = StubPaginator(_tagged_pages(arn + "dev-gone", arn + "dev-in-vpc"))
+    clients["resourcegroupstaggingapi"].get_paginator = lambda name: paginator
+
+    def get_function_configuration(FunctionName):
+        if FunctionName == "dev-gone":
+            raise _client_error("ResourceNotFoundException", "GetFunctionConfiguration")
+        return {"VpcConfig": {"VpcId": "vpc-123"}}
+
+    clients["lambda"].get_function_configuration = get_function_configuration
+
+    resources = _gather_tagged(("dev",), REGION, "env")
+
+    assert resources["vpc_lambdas"] == ["dev-in-vpc"]
+
+
+@pytest.fixture
+def clear_gather_caches():
+    cleanup_environment._clear_gather_caches()
+    yield
+    cleanup_environment._clear_gather_caches()
+
+
+def test_gather_concurrently_falls_back_only_without_tagged_match(
+    clients, clear_gather_caches
+):
+    arn = f"arn:aws:lambda:{REGION}:123456789012:function:dev-no-vpc"
+    paginator = StubPaginator(_tagged_pages(arn))
+    clients["resourcegroupstaggingapi"].get_paginator = lambda name: paginator
+    clients["lambda"].get_function_configuration = lambda FunctionName: {}
+
+    def gather_vpc_lambdas(substrings, region):
+        raise AssertionError("Tagged Lambda functions were found")
+
+    gatherers = {
+        "vpc_lambdas": gather_vpc_lambdas,
+        "log_groups": lambda substrings, region: ["/dev/untagged"],
+    }
+    resources = cleanup_environment._gather_concurrently(
+        gatherers, ("dev",), REGION, tag_key="env"
+    )
+
+    assert resources == {"vpc_lambdas": [], "log_groups": ["/dev/untagged"]}
+
+
+def _stack_id(stack_name):
+    return f"arn:aws:cloudformation:{REGION}:123456789012:stack/{stack_name}/1a2b3c"
+
+
+@pytest.fixture
+def waves(monkeypatch):
+    waves = []
+    monkeypatch.setattr(
+        cleanup_environment,
+        "delete_cloudformation_stacks_bulk",
+        lambda stack_names, region: waves.append(sorted(stack_names)),
+    )
+    return waves
+
+
+def _stub_exports(client, exports, imports):
+    """`exports` maps export names to stacks, `imports` export names to importers."""
+
+    class ImportsPaginator:
+        def paginate(self, ExportName):
+            if not imports.get(ExportName):
+                raise _client_error(
+                    "ValidationError",
+                    "ListImports",
+                    f"Export '{ExportName}' is not imported by any stack.",
+                )
+            return [{"Imports": imports[ExportName]}]
+
+    paginators = {
+        "list_exports": StubPaginator(
+            [
+                {
+                    "Exports": [
+                        {"Name": name, "ExportingStackId": _stack_id(stack_name)}
+                        for name, stack_name in exports.items()
+                    ]
+                }
+            ]
+        ),
+        "list_imports": ImportsPaginator(),
+    }
+    client.get_paginator = paginators.__getitem__
+
+
+def test_stack_waves_importer_before_exporter(clients, waves):
+    _stub_exports(
+        clients["cloudformation"],
+        exports={"dev-vpc-id": "dev-network", "prod-vpc-id": "prod-network"},
+        imports={"dev-vpc-id": ["dev-app", "prod-app"], "prod-vpc-id": ["prod-app"]},
+    )
+
+    delete_cloudformation_stacks_in_waves(["dev-network", "dev-app"], REGION)
+
+    assert waves == [["dev-app"], ["dev-network"]]
+
+
+def test_stack_waves_independent_stacks_share_a_wave(clients, waves):
+    _stub_exports(clients["cloudformation"], exports={}, imports={})
+
+    delete_cloudformation_stacks_in_waves(["dev-a", "dev-b", "dev-c"], REGION)
+
+    assert waves == [["dev-a", "dev-b", "dev-c"]]
+
+
+def test_stack_waves_unimported_export(clients, waves):
+    _stub_exports(
+        clients["cloudformation"],
+        exports={"dev-bucket-name": "dev-storage"},
+        imports={},
+    )
+
+    delete_cloudformation_stacks_in_waves(["dev-storage", "dev-app"], REGION)
+
+    assert waves == [["dev-app", "dev-storage"]]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(cleanup_environment.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def _stub_stacks(client, polls, missing=()):
+    """
+    Each DescribeStacks call returns the next entry of `polls`, a list of
+    (stack name, status, reason) tuples, repeating the last one when exhausted.
+    """
+    deleted = []
+
+    def delete_stack(StackName):
+        if StackName in missing:
+            raise _client_error(
+                "ValidationError",
+                "DeleteStack",
+                f"Stack with id {StackName} does not exist",
+            )
+        deleted.append(StackName)
+
+    class DescribeStacksPaginator:
+        def __init__(self):
+            self.calls = 0
+
+        def paginate(self):
+            stacks = polls[min(self.calls, len(polls) - 1)]
+            self.calls += 1
+            return [
+                {
+                    "Stacks": [
+                        {
+                            "StackName": name,
+                            "StackStatus": status,
+                            "StackStatusReason": reason,
+                        }
+                        for name, status, reason in stacks
+                    ]
+                }
+            ]
+
+    paginator = DescribeStacksPaginator()
+    client.delete_stack = delete_stack
+    client.get_paginator = lambda name: paginator
+    return deleted, paginator
+
+
+def test_delete_stacks_bulk_gone_stacks_complete(clients, sleeps):
+    deleted, _ = _stub_stacks(
+        clients["cloudformation"],
+        polls=[
+            [
+                ("dev-a", "DELETE_IN_PROGRESS", None),
+                ("dev-b", "DELETE_IN_PROGRESS", None),
+            ],
+            [("dev-a", "DELETE_IN_PROGRESS", None)],
+            [],
+        ],
+    )
+
+    delete_cloudformation_stacks_bulk(["dev-a", "dev-b"], REGION)
+
+    assert deleted == ["dev-a", "dev-b"]
+    assert sleeps == [2, 4, 8]
+
+
+def test_delete_stacks_bulk_delete_failed(clients, sleeps):
+    _stub_stacks(
+        clients["cloudformation"],
+        polls=[[("dev-a", "DELETE_FAILED", "Bucket is not empty")]],
+    )
+
+    with pytest.raises(click.ClickException, match="Bucket is not empty"):
+        delete_cloudformation_stacks_bulk(["dev-a"], REGION)
+
+
+def test_delete_stacks_bulk_timeout(clients, sleeps, monkeypatch):
+    monkeypatch.setattr(cleanup_environment, "STACK_POLL_MAX_ATTEMPTS", 3)
+    _stub_stacks(
+        clients["cloudformation"],
+        polls=[[("dev-a", "DELETE_IN_PROGRESS", None)]],
+    )
+
+    with pytest.raises(click.ClickException, match="Timed out.*dev-a"):
+        delete_cloudformation_stacks_bulk(["dev-a"], REGION)
+    assert len(sleeps) == 3
+
+
+def test_delete_stacks_bulk_missing_stack_skipped(clients, sleeps):
+    deleted, paginator = _stub_stacks(
+        clients["cloudformation"], polls=[[]], missing=("dev-gone",)
+    )
+
+    delete_cloudformation_stacks_bulk(["dev-gone"], REGION)
+
+    assert deleted == []
+    assert paginator.calls == 0
+    assert sleeps == []
+
+
+def _stub_bucket(client, versioning, paginator_name, pages):
+    deleted = []
+
+    def delete_objects(Bucket, Delete):
+        deleted.extend(Delete["Objects"])
+        return {}
+
+    paginators = {paginator_name: StubPaginator(pages)}
+    client.get_bucket_versioning = lambda Bucket: versioning
+    client.get_paginator = paginators.__getitem__
+    client.delete_objects = delete_objects
+    return deleted
+
+
+def test_empty_s3_bucket_unversioned(clients):
+    client = clients["s3"]
+    deleted = _stub_bucket(
+        client,
+        versioning={},
+        paginator_name="list_objects_v2",
+        pages=[{"Contents": [{"Key": "a"}, {"Key": "b"}]}, {}],
+    )
+
+    cleanup_environment._empty_s3_bucket(client, "dev-bucket")
+
+    assert sorted(obj["Key"] for obj in deleted) == ["a", "b"]
+
+
+def test_empty_s3_bucket_versioned(clients):
+    client = clients["s3"]
+    deleted = _stub_bucket(
+        client,
+        versioning={"Status": "Suspended"},
+        paginator_name="list_object_versions",
+        pages=[
+            {
+                "Versions": [
+                    {"Key": "a", "VersionId": "1"},
+                    {"Key": "a", "VersionId": "2"},
+                ],
+                "DeleteMarkers": [{"Key": "b", "VersionId": "3"}],
+            },
+            {"DeleteMarkers": [{"Key": "c", "VersionId": "4"}]},
+        ],
+    )
+
+    cleanup_environment._empty_s3_bucket(client, "dev-bucket")
+
+    assert sorted((obj["Key"], obj["VersionId"]) for obj in deleted) == [
+        ("a", "1"),
+        ("a", "2"),
+        ("b", "3"),
+        ("c", "4"),
+    ]
+
+
+def test_empty_s3_bucket_bounds_pending_batches(clients):
+    client = clients["s3"]
+    listed = []
+
+    def pages():
+        for i in range(200):
+            listed.append(i)
+            yield {"Contents": [{"Key": str(i)}]}
+
+    deleted = _stub_bucket(
+        client, versioning={}, paginator_name="list_objects_v2", pages=pages()
+    )
+    release = threading.Event()
+    delete_objects = client.delete_objects
+
+    def blocking_delete_objects(**kwargs):
+        release.wait()
+        return delete_objects(**kwargs)
+
+    client.delete_objects = blocking_delete_objects
+    emptying = threading.Thread(
+        target=cleanup_environment._empty_s3_bucket, args=(client, "dev-bucket")
+    )
+    emptying.start()
+    try:
+        # Give listing the chance to run ahead while no delete can finish.
+        time.sleep(0.2)
+        assert len(listed) <= cleanup_environment.MAX_PENDING_DELETE_BATCHES + 1
+    finally:
+        release.set()
+        emptying.join()
+
+    assert len(deleted) == 200
+
+
+def _stub_repository(client, pages, failures=()):
+    batches = []
+
+    def batch_delete_image(repositoryName, imageIds):
+        batches.append(imageIds)
+        return {"imageIds": imageIds, "failures": list(failures)}
+
+    client.get_paginator = lambda name: StubPaginator(pages)
+    client.batch_delete_image = batch_delete_image
+    return batches
+
+
+def test_empty_ecr_repositories(clients):
+    digests = [f"sha256:{i:064x}" for i in range(250)]
+
+    def images(tag, digests):
+        return [{"imageDigest": digest, "imageTag": tag} for digest in digests]
+
+    batches = _stub_repository(
+        clients["ecr"],
+        pages=[
+            {"imageIds": images("v1", digests[:200])},
+            # Images tagged twice are listed once per tag.
+            {"imageIds": images("v2", digests[150:]) + images("latest", digests[:1])},
+        ],
+    )
+
+    empty_ecr_repositories(["dev-repo"], REGION)
+
+    assert sorted(len(batch) for batch in batches) == [50, 100, 100]
+    deleted = [image["imageDigest"] for batch in batches for image in batch]
+    assert sorted(deleted) == digests
+
+
+def test_empty_ecr_repositories_failures(clients):
+    _stub_repository(
+        clients["ecr"],
+        pages=[{"imageIds": [{"imageDigest": "sha256:1"}]}],
+        failures=[
+            {
+                "imageId": {"imageDigest": "sha256:1"},
+                "failureCode": "ImageReferencedByManifestList",
+                "failureReason": "Image is referenced by a manifest list",
+            }
+        ],
+    )
+
+    with pytest.raises(RuntimeError, match="referenced by a manifest list"):
+        empty_ecr_repositories(["dev-repo"], REGION)
+
+
+def test_gather_s3_buckets_skips_ignored(clients, clear_gather_caches):
+    clients["s3"].list_buckets = lambda: {
+        "Buckets": [
+            {"Name": "dev-app"},
+            {"Name": "dev-cloudtrail-logs"},
+            {"Name": "prod-app"},
+        ]
+    }
+
+    buckets = gather_s3_buckets(("dev",), REGION, ignore_list=("dev-cloudtrail",))
+
+    assert buckets == ["dev-app"]
+
+
+@pytest.mark.parametrize(
+    "cleanup",
+    [
+        lambda ignored: empty_s3_buckets(
+            ["dev-app", "dev-cloudtrail-logs"], REGION, ignored
+        ),
+        lambda ignored: delete_s3_bucket("dev-cloudtrail-logs", REGION, ignored),
+    ],
+    ids=["empty", "delete"],
+)
+def test_ignored_bucket_refused(clients, cleanup):
+    emptied = []
+    clients["s3"].get_bucket_versioning = lambda Bucket: emptied.append(Bucket) or {}
+    clients["s3"].get_paginator = lambda name: StubPaginator([])
+
+    def delete_bucket(Bucket):
+        raise AssertionError(f"{Bucket} must not be deleted")
+
+    clients["s3"].delete_bucket = delete_bucket
+
+    with pytest.raises(click.ClickException, match="dev-cloudtrail-logs"):
+        cleanup(("dev-cloudtrail",))
+    assert "dev-cloudtrail-logs" not in emptied
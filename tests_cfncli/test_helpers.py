@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import pytest
 
 from cfncli.exceptions import (
@@ -6,16 +8,25 @@ from cfncli.exceptions import (
 )
 from cfncli.helpers import (
     convert_json_fields,
+    convert_json_fields_many,
     generate_response,
     get_ssm_parameter,
     str_to_json,
+    substring_matcher,
+    ttl_cache,
 )
 
 
 
-def test_str_to_json_success():
-    str_input = '{"key": "value"}'
-    expected_output = {"key": "value"}
+@pytest.mark.parametrize(
+    "str_input, expected_output",
+    [
+        ('{"key": "value"}', {"key": "value"}),
+        (' {"a": 1}', {"a": 1}),
+        ("\n[1, 2]", [1, 2]),
+    ],
+)
+def test_str_to_json_success(str_input, expected_output):
     assert str_to_json(str_input) == expected_output
 
 
@@ -24,20 +35,112 @@ def test_str_to_json_pass():
     assert str_to_json(str_input) == str_input
 
 
-def test_convert_json_fields():
-    item = {"json_field": '{"key": "value"}', "non_json_field": "test"}
-    fields = ["json_field"]
-    expected_output = {"json_field": {"key": "value"}, "non_json_field": "test"}
+plain_fields = {f"field_{i}": f"value_{i}" for i in range(8)}
+
+
+@pytest.mark.parametrize(
+    "item, fields, expected_output",
+    [
+        (
+            {"json_field": '{"key": "value"}', "non_json_field": "test"},
+            ["json_field"],
+            {"json_field": {"key": "value"}, "non_json_field": "test"},
+        ),
+        (  # 10 fields, only 2 of them hold JSON
+            {**plain_fields, "object_field": '{"key": "value"}', "array_field": "[1, 2]"},
+            [*plain_fields, "object_field", "array_field"],
+            {**plain_fields, "object_field": {"key": "value"}, "array_field": [1, 2]},
+        ),
+    ],
+)
+def test_convert_json_fields(item, fields, expected_output):
     assert convert_json_fields(item, fields) == expected_output
 
 
+def test_convert_json_fields_many():
+    fields = ("config", "tags", "name")
+    items = [
+        {
+            "id": i,
+            "config": f'{{"size": {i}}}',
+            "tags": "[]" if i % 2 else "not json",
+            "name": "plain",
+        }
+        for i in range(1000)
+    ]
+    assert convert_json_fields_many(items, fields) == [
+        {
+            "id": i,
+            "config": {"size": i},
+            "tags": [] if i % 2 else "not json",
+            "name": "plain",
+        }
+        for i in range(1000)
+    ]
+
+
 def test_generate_response():
     data = {"key": "value"}
     status_code = 200
-    expected_output = {"statusCode": 200, "body": '{"key": "value"}'}
+    expected_output = {"statusCode": 200, "body": '{"key":"value"}'}
     assert generate_response(data, status_code) == expected_output
 
 
+def test_generate_response_as_bytes():
+    data = {"key": "välue"}
+    expected_output = {"statusCode": 200, "body": '{"key":"välue"}'.encode()}
+    assert generate_response(data, as_bytes=True) == expected_output
+
+
+def test_generate_response_non_str_keys():
+    data = {1: "a", None: "b", 2.5: "c"}
+    expected_output = {"statusCode": 200, "body": '{"1":"a","null":"b","2.5":"c"}'}
+    assert generate_response(data) == expected_output
+
+
+def test_generate_response_naive_datetime():
+    data = {"created": datetime(2024, 1, 1, 12, 0)}
+    expected_output = {
+        "statusCode": 200,
+        "body": '{"created":"2024-01-01T12:00:00+00:00"}',
+    }
+    assert generate_response(data) == expected_output
+
+
+@pytest.mark.parametrize("on_disk", [True, False])
+def test_ttl_cache(tmp_path, on_disk):
+    calls = []
+
+    @ttl_cache(path=str(tmp_path) if on_disk else None, ttl=300)
+    def gather(substrings, region):
+        calls.append((substrings, region))
+        return [f"{sub}-{region}" for sub in substrings]
+
+    assert gather(["dev"], "us-east-1") == ["dev-us-east-1"]
+    assert gather(["dev"], "us-east-1") == ["dev-us-east-1"]
+    assert gather(["dev"], "us-west-2") == ["dev-us-west-2"]
+    assert len(calls) == 2
+    assert any(tmp_path.iterdir()) is on_disk
+
+    gather.cache_clear()
+    assert gather(["dev"], "us-east-1") == ["dev-us-east-1"]
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize(
+    "substrings, name, expected",
+    [
+        (("dev", "qa"), "dev-stack", True),
+        (("dev", "qa"), "team-qa-bucket", True),
+        (("dev", "qa"), "prod-stack", False),
+        (("a.b",), "axb-stack", False),  # Substrings are matched literally
+        ((), "dev-stack", False),
+    ],
+)
+def test_substring_matcher(substrings, name, expected):
+    assert substring_matcher(substrings)(name) is expected
+
+
 def test_handle_exceptions_success():
     @handle_exceptions(user_exceptions=[])
     def function_that_does_not_raise(event, context):
@@ -57,7 +160,7 @@ def test_handle_exceptions_failure():
     context = {}
     response = function_that_raises(event, context)
     assert response["statusCode"] == 500
-    assert response["body"] == '{"message": "error"}'
+    assert response["body"] == '{"message":"error"}'
 
 
 # @pytest.mark.parametrize(
@@ -69,11 +172,20 @@ def test_handle_exceptions_failure():
 #     ],
 # )
 
+@pytest.fixture(autouse=True)
+def clear_ssm_cache():
+    yield
+    get_ssm_parameter.cache_clear()
+
+
 @pytest.fixture
-def mock_ssm_client(mocker):
-    mock_client = mocker.Mock()
-    mocker.patch("cfncli.helpers.boto3.client", return_value=mock_client)
-    return mock_client
+def mock_ssm_client(monkeypatch):
+    class StubSSMClient:
+        pass
+
+    client = StubSSMClient()
+    monkeypatch.setattr("cfncli.helpers._SSM", client)
+    return client
 
 
 test_data = [
@@ -84,16 +196,22 @@ test_data = [
     ),
     (  # Case 2
         None,
-        ApplicationException("Parameter not found."),
+        (ApplicationException, "Parameter not found."),  # Exception class and message
         "Parameter not found.",  # Expected exception message
     ),
 ]
 
 @pytest.mark.parametrize("ssm_response, ssm_exception, expected", test_data)
 def test_get_ssm_parameter(mock_ssm_client, ssm_response, ssm_exception, expected):
-    mock_ssm_client.get_parameter.return_value = ssm_response
     if ssm_exception:
-        mock_ssm_client.get_parameter.side_effect = ssm_exception
+        exception_class, message = ssm_exception
+
+        def get_parameter(**kwargs):
+            raise exception_class(message)
+
+        mock_ssm_client.get_parameter = get_parameter
+    else:
+        mock_ssm_client.get_parameter = lambda **kwargs: ssm_response
 
     if ssm_exception:
         with pytest.raises(ApplicationException) as e:
@@ -102,3 +220,17 @@ def test_get_ssm_parameter(mock_ssm_client, ssm_response, ssm_exception, expecte
     else:
         result = get_ssm_parameter("test_param_name")
         assert result == expected
+
+
+def test_get_ssm_parameter_cached(mock_ssm_client):
+    calls = []
+
+    def get_parameter(**kwargs):
+        calls.append(kwargs)
+        return {"Parameter": {"Value": "test_value"}}
+
+    mock_ssm_client.get_parameter = get_parameter
+
+    assert get_ssm_parameter("test_param_name") == "test_value"
+    assert get_ssm_parameter("test_param_name") == "test_value"
+    assert len(calls) == 1